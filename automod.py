@@ -0,0 +1,205 @@
+import asyncio
+import multiprocessing
+import os
+import re
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+# Auto-moderation content scanning.
+#
+# Checks are plain top-level functions so they can be pickled by reference
+# and run inside worker processes. Each check takes the raw message content,
+# the folded (normalized) content and the bad word list, and returns a warning
+# to show the author or None if the message is clean.
+
+# Lookalike characters folded to their ASCII equivalent before matching
+CONFUSABLES = str.maketrans({
+    'а': 'a', 'е': 'e', 'о': 'o', 'р': 'p', 'с': 'c', 'у': 'y', 'х': 'x',
+    'і': 'i', 'ј': 'j', 'ѕ': 's', 'ԁ': 'd', 'ɡ': 'g', 'ո': 'n', 'ν': 'v',
+    'α': 'a', 'ο': 'o', 'ρ': 'p', 'τ': 't', 'κ': 'k', 'ι': 'i',
+    '0': 'o', '1': 'i', '3': 'e', '4': 'a', '5': 's', '7': 't',
+    '@': 'a', '$': 's', '!': 'i', '|': 'l',
+    '\u200b': None, '\u200c': None, '\u200d': None, '\u2060': None, '\ufeff': None,
+})
+
+INVITE_RE = re.compile(r'(?:discord\.gg|discord(?:app)?\.com/invite)/[\w-]+', re.IGNORECASE)
+LINK_RE = re.compile(r'https?://\S+', re.IGNORECASE)
+
+
+def fold(text):
+    text = unicodedata.normalize('NFKC', text).casefold()
+    # Drop combining marks left over after decomposition (e.g. "bádword")
+    text = ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+    return text.translate(CONFUSABLES)
+
+
+def check_bad_words(content, folded, bad_words):
+    content_lower = content.lower()
+    for word in bad_words:
+        if word in content_lower or fold(word) in folded:
+            return 'please watch your language!'
+    return None
+
+
+def check_invites(content, folded, bad_words):
+    if INVITE_RE.search(content):
+        return 'server invites are not allowed here!'
+    return None
+
+
+def check_links(content, folded, bad_words):
+    if LINK_RE.search(content):
+        return 'links are not allowed here!'
+    return None
+
+
+def scan_content(content, bad_words, checks):
+    folded = fold(content)
+    for check in checks:
+        warning = check(content, folded, bad_words)
+        if warning:
+            return warning
+    return None
+
+
+def scan_batch(contents, bad_words, checks):
+    return [scan_content(content, bad_words, checks) for content in contents]
+
+
+class ScanPipeline:
+    """Batches message content and scans it in a process pool.
+
+    Messages are collected for ``window`` seconds (or until ``max_batch`` is
+    reached) and sent to the pool as one job. When ``max_in_flight`` batches
+    are already queued, or the pool is unavailable, messages are scanned
+    inline on the event loop instead.
+    """
+
+    def __init__(self, bad_words, checks, window=0.005, max_batch=256, max_in_flight=None, workers=None):
+        self.bad_words = bad_words
+        self.checks = tuple(checks)
+        self.window = window
+        self.max_batch = max_batch
+        self.workers = workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or self.workers * 2
+        self.inline_scans = 0
+        self._executor = None
+        self._pending = []  # [(content, future)]
+        self._flush_handle = None
+        self._in_flight = 0
+        self._starting = False
+        self._closed = False
+        self._restart_task = None
+
+    async def start(self):
+        # Messages are scanned inline until the workers are up
+        if self._executor is not None or self._starting:
+            return
+        self._closed = False
+        self._starting = True
+        try:
+            executor = await asyncio.get_running_loop().run_in_executor(None, self._new_executor)
+        finally:
+            self._starting = False
+
+        if self._closed:
+            executor.shutdown(wait=False)
+        else:
+            self._executor = executor
+
+    def _new_executor(self):
+        # Never fork: the bot process already runs discord.py/aiohttp threads
+        method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context(method))
+        # Launch the workers here (off the loop) rather than on the first batch
+        wait([executor.submit(int) for _ in range(self.workers)])
+        return executor
+
+    def _restart(self, broken):
+        # A worker died; replace the pool unless that already happened
+        if self._executor is broken:
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._restart_task = asyncio.get_running_loop().create_task(self.start())
+
+    def close(self):
+        self._closed = True
+        executor, self._executor = self._executor, None
+        # Anything still waiting for the window is scanned inline
+        self._flush()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def scan(self, content):
+        if self._executor is None or self._in_flight >= self.max_in_flight:
+            # Pool not running or saturated: scan on the loop
+            self.inline_scans += 1
+            return scan_content(content, tuple(self.bad_words), self.checks)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((content, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        bad_words = tuple(self.bad_words)
+        contents = [content for content, _ in batch]
+
+        executor = self._executor
+        if executor is None or self._in_flight >= self.max_in_flight:
+            self._scan_inline(batch, contents, bad_words)
+            return
+
+        try:
+            job = asyncio.get_running_loop().run_in_executor(
+                executor, scan_batch, contents, bad_words, self.checks
+            )
+        except BrokenProcessPool:
+            self._restart(executor)
+            self._scan_inline(batch, contents, bad_words)
+            return
+
+        self._in_flight += 1
+        job.add_done_callback(lambda job: self._on_batch_done(batch, contents, bad_words, executor, job))
+
+    def _on_batch_done(self, batch, contents, bad_words, executor, job):
+        self._in_flight -= 1
+        if not job.cancelled() and isinstance(job.exception(), BrokenProcessPool):
+            self._restart(executor)
+        if job.cancelled() or job.exception() is not None:
+            self._scan_inline(batch, contents, bad_words)
+        else:
+            self._resolve(batch, job.result())
+
+    def _scan_inline(self, batch, contents, bad_words):
+        self.inline_scans += len(batch)
+        try:
+            results = scan_batch(contents, bad_words, self.checks)
+        except Exception as e:
+            # A failing check must reach the waiting handlers, not leave them hanging
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self._resolve(batch, results)
+
+    @staticmethod
+    def _resolve(batch, results):
+        for (_, future), warning in zip(batch, results):
+            if not future.done():
+                future.set_result(warning)
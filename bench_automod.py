@@ -0,0 +1,89 @@
+import argparse
+import asyncio
+import random
+import statistics
+import string
+import time
+
+import automod
+
+# Floods the auto-mod scanner with messages and measures event loop lag, once
+# with every message scanned inline and once through the process pool.
+#
+#   python bench_automod.py --rate 5000 --seconds 5
+
+BAD_WORDS = ['badword1', 'badword2']
+CHECKS = [automod.check_bad_words, automod.check_invites, automod.check_links]
+
+
+def make_message(rng):
+    words = [''.join(rng.choices(string.ascii_letters, k=rng.randint(2, 10))) for _ in range(rng.randint(5, 60))]
+    roll = rng.random()
+    if roll < 0.02:
+        words.append('bаdwоrd1')  # Cyrillic lookalikes
+    elif roll < 0.04:
+        words.append('discord.gg/abc123')
+    return ' '.join(words)
+
+
+async def probe(stop, lags, interval=0.001):
+    # Lag is how late a 1ms sleep wakes up
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lags.append(loop.time() - start - interval)
+
+
+async def flood(scanner, rate, seconds, messages):
+    loop = asyncio.get_running_loop()
+    tasks = []
+    start = loop.time()
+    end = start + seconds
+    while loop.time() < end:
+        # Pace against the clock so sleep overshoot doesn't lower the rate
+        due = int((loop.time() - start) * rate) - len(tasks)
+        for _ in range(due):
+            tasks.append(asyncio.create_task(scanner.scan(messages[len(tasks) % len(messages)])))
+        await asyncio.sleep(0.01)
+    results = await asyncio.gather(*tasks)
+    return len(results), sum(1 for warning in results if warning)
+
+
+async def run(use_pool, rate, seconds, workers):
+    rng = random.Random(0)
+    messages = [make_message(rng) for _ in range(10000)]
+    scanner = automod.ScanPipeline(BAD_WORDS, CHECKS, workers=workers)
+    if use_pool:
+        await scanner.start()
+
+    stop = asyncio.Event()
+    lags = []
+    probe_task = asyncio.create_task(probe(stop, lags))
+    started = time.perf_counter()
+    total, flagged = await flood(scanner, rate, seconds, messages)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe_task
+    scanner.close()
+
+    lags_ms = sorted(lag * 1000 for lag in lags)
+    p99 = lags_ms[int(len(lags_ms) * 0.99) - 1]
+    print(f"{'pool' if use_pool else 'inline':>6}: {total} msgs at {total / seconds:.0f}/s, all scanned after {elapsed:.2f}s, "
+          f"flagged {flagged}, inline fallbacks {scanner.inline_scans}, "
+          f"loop lag p50 {statistics.median(lags_ms):.2f}ms p99 {p99:.2f}ms max {lags_ms[-1]:.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark auto-mod scanning under a message flood')
+    parser.add_argument('--rate', type=int, default=5000, help='messages per second')
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    asyncio.run(run(False, args.rate, args.seconds, args.workers))
+    asyncio.run(run(True, args.rate, args.seconds, args.workers))
+
+
+if __name__ == '__main__':
+    main()
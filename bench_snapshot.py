@@ -0,0 +1,68 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import snapshot
+
+# Times saving and loading a state snapshot the size of a busy bot.
+#
+#   python bench_snapshot.py --records 1000000
+
+
+def make_state(records, rng):
+    # Records are split between warnings, custom commands and reaction roles
+    start = datetime(2024, 1, 1)
+    warnings = {}
+    for i in range(records * 8 // 10):
+        warnings.setdefault(rng.randrange(records // 10), []).append({
+            'reason': f'Rule {rng.randint(1, 20)} violation',
+            'date': start + timedelta(seconds=rng.randrange(10 ** 8)),
+            'moderator': f'mod{rng.randint(1, 50)}#0001'
+        })
+
+    custom_commands = {f'cmd{i}': f'Response number {i}' for i in range(records // 10)}
+
+    reaction_roles = {}
+    for i in range(records // 10):
+        reaction_roles.setdefault(10 ** 17 + i // 5, {})[f'emoji{i % 5}'] = 10 ** 17 + i
+
+    return {
+        'version': 1,
+        'warnings': warnings,
+        'custom_commands': custom_commands,
+        'reaction_roles': reaction_roles,
+        'bad_words': ['badword1', 'badword2'],
+        'welcome_channel_id': 10 ** 17,
+        'active_games': {(i, i): {'game': 'gtn', 'channel_id': i, 'user_id': i, 'number': 50, 'attempts': 1, 'max_attempts': 7} for i in range(1000)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark state snapshot save and restore')
+    parser.add_argument('--records', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    state = make_state(args.records, random.Random(0))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bot_state.snapshot')
+        for run in range(1, args.repeat + 1):
+            start = time.perf_counter()
+            snapshot.save(path, state)
+            saved = time.perf_counter() - start
+
+            start = time.perf_counter()
+            restored = snapshot.load(path)
+            loaded = time.perf_counter() - start
+
+            assert restored == state
+            print(f'run {run}: {args.records} records, {os.path.getsize(path) / 2 ** 20:.1f} MiB, '
+                  f'save {saved * 1000:.0f}ms, load {loaded * 1000:.0f}ms')
+
+
+if __name__ == '__main__':
+    main()
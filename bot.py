@@ -4,10 +4,17 @@ from datetime import datetime, timedelta
 import asyncio
 import random
 import os
+import signal
+import time
 from dotenv import load_dotenv
+import automod
+import snapshot
 
 load_dotenv()
 TOKEN = os.getenv("DISCORD_TOKEN")
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", "bot_state.snapshot")
+SNAPSHOT_VERSION = 1
+GAME_RESUME_WINDOW = 300  # Seconds after shutdown that saved games are still resumed
 
 # Bot setup
 intents = discord.Intents.default()
@@ -25,23 +32,132 @@ reaction_roles = {}  # {message_id: {emoji: role_id}}
 bad_words = ['badword1', 'badword2']  # Add words to filter
 welcome_channel_id = None  # Set this to your welcome channel ID or use !setwelcome
 
+# Auto-mod checks run on every message (see automod.py for more, e.g. check_invites)
+automod_checks = [automod.check_bad_words]
+scanner = automod.ScanPipeline(bad_words, automod_checks)
+
+# Running games, saved on shutdown and resumed on restart
+active_games = {}  # {command_message_id: {'game': 'gtn'/'trivia', ...}}
+game_tasks = {}  # {command_message_id: task}
+handlers = set()  # on_message handlers still running
+shutting_down = False
+shutdown_task = None
+state_saved = False
+
+# ============ STATE SNAPSHOTS ============
+
+def save_state():
+    start = time.perf_counter()
+    snapshot.save(SNAPSHOT_PATH, {
+        'version': SNAPSHOT_VERSION,
+        'saved_at': time.time(),
+        'warnings': warnings,
+        'custom_commands': custom_commands,
+        'reaction_roles': reaction_roles,
+        'bad_words': bad_words,
+        'welcome_channel_id': welcome_channel_id,
+        'active_games': active_games,
+    })
+    return time.perf_counter() - start
+
+def restore_state():
+    global welcome_channel_id
+    if not os.path.exists(SNAPSHOT_PATH):
+        return
+
+    start = time.perf_counter()
+    try:
+        state = snapshot.load(SNAPSHOT_PATH)
+    except Exception as e:
+        print(f'❌ Could not load snapshot {SNAPSHOT_PATH}: {e}')
+        return
+
+    if state.get('version') != SNAPSHOT_VERSION:
+        print(f'❌ Ignoring snapshot {SNAPSHOT_PATH}: unsupported version {state.get("version")}')
+        return
+
+    warnings.update(state['warnings'])
+    custom_commands.update(state['custom_commands'])
+    reaction_roles.update(state['reaction_roles'])
+    bad_words[:] = state['bad_words']
+    welcome_channel_id = state['welcome_channel_id']
+    print(f'♻️ Restored state from {SNAPSHOT_PATH} in {(time.perf_counter() - start) * 1000:.1f}ms')
+
+    if state['active_games']:
+        # Games are resumed once: a crash before the next shutdown must not bring them back
+        try:
+            snapshot.save(SNAPSHOT_PATH, {**state, 'active_games': {}})
+        except Exception as e:
+            print(f'❌ Not resuming games, could not update {SNAPSHOT_PATH}: {e}')
+            return
+        if time.time() - state['saved_at'] < GAME_RESUME_WINDOW:
+            active_games.update(state['active_games'])
+
+def request_shutdown():
+    # Keep a reference; the loop only holds tasks weakly
+    global shutdown_task
+    if shutdown_task is None:
+        shutdown_task = asyncio.create_task(shutdown())
+
+async def shutdown():
+    global shutting_down, state_saved
+    if shutting_down:
+        return
+    shutting_down = True
+    print('🛑 Shutting down...')
+
+    # Games can wait for minutes; stop them and keep their state for the restart
+    for task in game_tasks.values():
+        task.cancel()
+
+    # Let everything else finish what it was doing
+    pending = handlers - {asyncio.current_task()}
+    if pending:
+        await asyncio.wait(pending, timeout=10.0)
+
+    try:
+        scanner.close()
+        elapsed = save_state()
+        state_saved = True
+        print(f'💾 Saved state to {SNAPSHOT_PATH} in {elapsed * 1000:.1f}ms')
+    except Exception as e:
+        print(f'❌ Could not save state to {SNAPSHOT_PATH}: {e}')
+    finally:
+        await bot.close()
+
 # Bot ready event
 @bot.event
 async def on_ready():
     print(f'✅ Bot is online as {bot.user}')
+
+    # Pick up games that were running when the bot last shut down
+    for game_id, state in list(active_games.items()):
+        if game_id not in game_tasks:
+            game_tasks[game_id] = asyncio.create_task(resume_game(state))
     await bot.change_presence(activity=discord.Activity(type=discord.ActivityType.watching, name='!help for commands'))
 
+    # Auto-mod scans inline until the worker processes have started
+    await scanner.start()
+
 # Auto-moderation: Bad word filter
 @bot.event
 async def on_message(message):
-    if message.author.bot:
+    if message.author.bot or shutting_down:
         return
-    
-    # Check for bad words
-    content_lower = message.content.lower()
-    if any(word in content_lower for word in bad_words):
+
+    task = asyncio.current_task()
+    handlers.add(task)
+    try:
+        await handle_message(message)
+    finally:
+        handlers.discard(task)
+
+async def handle_message(message):
+    # Run auto-mod checks (bad words, invites, ...) off the event loop
+    warning = await scanner.scan(message.content)
+    if warning:
         await message.delete()
-        await message.channel.send(f'{message.author.mention}, please watch your language!')
+        await message.channel.send(f'{message.author.mention}, {warning}')
         return
     
     # Check for custom commands
@@ -212,8 +328,8 @@ async def warn_error(ctx, error):
         await ctx.send('❌ You do not have permission to warn members.')
 
 # WARNINGS COMMAND
-@bot.command()
-async def warnings(ctx, member: discord.Member = None):
+@bot.command(name='warnings')
+async def warnings_command(ctx, member: discord.Member = None):
     member = member or ctx.author
     user_warnings = warnings.get(member.id, [])
     
@@ -515,44 +631,103 @@ async def choose(ctx, *, choices: str):
 
 # ============ GAME COMMANDS ============
 
+TRIVIA_QUESTIONS = [
+    {"q": "What is the capital of France?", "a": ["paris"], "c": "Paris"},
+    {"q": "What is 2 + 2?", "a": ["4", "four"], "c": "4"},
+    {"q": "What color is the sky on a clear day?", "a": ["blue"], "c": "Blue"},
+    {"q": "How many continents are there?", "a": ["7", "seven"], "c": "7"},
+    {"q": "What is the largest planet in our solar system?", "a": ["jupiter"], "c": "Jupiter"},
+    {"q": "What year did World War 2 end?", "a": ["1945"], "c": "1945"},
+    {"q": "What is the fastest land animal?", "a": ["cheetah"], "c": "Cheetah"},
+    {"q": "Who painted the Mona Lisa?", "a": ["leonardo da vinci", "da vinci", "leonardo"], "c": "Leonardo da Vinci"},
+    {"q": "What is the chemical symbol for gold?", "a": ["au"], "c": "Au"},
+    {"q": "How many legs does a spider have?", "a": ["8", "eight"], "c": "8"}
+]
+
+# Games keep their state in active_games so they survive a restart
+async def run_game(channel, state):
+    game_id = state['id']
+    active_games[game_id] = state
+    game_tasks[game_id] = asyncio.current_task()
+    interrupted = False
+    try:
+        if state['game'] == 'gtn':
+            await play_gtn(channel, state)
+        else:
+            await play_trivia(channel, state)
+    except asyncio.CancelledError:
+        # Cancelled by shutdown: keep unfinished games so they resume after restart
+        interrupted = not state.get('finished')
+        raise
+    finally:
+        game_tasks.pop(game_id, None)
+        if not interrupted:
+            active_games.pop(game_id, None)
+
+async def resume_game(state):
+    channel = bot.get_channel(state['channel_id'])
+    if not channel:
+        active_games.pop(state['id'], None)
+        game_tasks.pop(state['id'], None)
+        return
+
+    mention = f'<@{state["user_id"]}>'
+    try:
+        if state['game'] == 'gtn':
+            attempts_left = state['max_attempts'] - state['attempts']
+            await channel.send(f'♻️ {mention}, I\'m back! Keep guessing my number between 1 and 100 ({attempts_left} attempts left)')
+        else:
+            embed = discord.Embed(
+                title="🧠 Trivia Time!",
+                description=TRIVIA_QUESTIONS[state['question']]["q"],
+                color=discord.Color.blue()
+            )
+            embed.set_footer(text="You have 15 seconds to answer!")
+            await channel.send(f'♻️ {mention}, I\'m back! Here\'s your question again:', embed=embed)
+    except discord.HTTPException:
+        active_games.pop(state['id'], None)
+        game_tasks.pop(state['id'], None)
+        return
+
+    await run_game(channel, state)
+
 @bot.command()
 async def trivia(ctx):
-    questions = [
-        {"q": "What is the capital of France?", "a": ["paris"], "c": "Paris"},
-        {"q": "What is 2 + 2?", "a": ["4", "four"], "c": "4"},
-        {"q": "What color is the sky on a clear day?", "a": ["blue"], "c": "Blue"},
-        {"q": "How many continents are there?", "a": ["7", "seven"], "c": "7"},
-        {"q": "What is the largest planet in our solar system?", "a": ["jupiter"], "c": "Jupiter"},
-        {"q": "What year did World War 2 end?", "a": ["1945"], "c": "1945"},
-        {"q": "What is the fastest land animal?", "a": ["cheetah"], "c": "Cheetah"},
-        {"q": "Who painted the Mona Lisa?", "a": ["leonardo da vinci", "da vinci", "leonardo"], "c": "Leonardo da Vinci"},
-        {"q": "What is the chemical symbol for gold?", "a": ["au"], "c": "Au"},
-        {"q": "How many legs does a spider have?", "a": ["8", "eight"], "c": "8"}
-    ]
-    
-    trivia_q = random.choice(questions)
+    state = {
+        'game': 'trivia',
+        'id': ctx.message.id,
+        'channel_id': ctx.channel.id,
+        'user_id': ctx.author.id,
+        'question': random.randrange(len(TRIVIA_QUESTIONS))
+    }
     
     embed = discord.Embed(
         title="🧠 Trivia Time!",
-        description=trivia_q["q"],
+        description=TRIVIA_QUESTIONS[state['question']]["q"],
         color=discord.Color.blue()
     )
     embed.set_footer(text="You have 15 seconds to answer!")
     
     await ctx.send(embed=embed)
+    await run_game(ctx.channel, state)
+
+async def play_trivia(channel, state):
+    trivia_q = TRIVIA_QUESTIONS[state['question']]
     
     def check(m):
-        return m.author == ctx.author and m.channel == ctx.channel
+        return m.author.id == state['user_id'] and m.channel.id == state['channel_id']
     
     try:
         msg = await bot.wait_for('message', timeout=15.0, check=check)
+        state['finished'] = True
         
         if msg.content.lower() in trivia_q["a"]:
-            await ctx.send(f'✅ Correct, {ctx.author.mention}! The answer is **{trivia_q["c"]}**')
+            await channel.send(f'✅ Correct, {msg.author.mention}! The answer is **{trivia_q["c"]}**')
         else:
-            await ctx.send(f'❌ Wrong! The correct answer was **{trivia_q["c"]}**')
+            await channel.send(f'❌ Wrong! The correct answer was **{trivia_q["c"]}**')
     except asyncio.TimeoutError:
-        await ctx.send(f'⏰ Time\'s up! The answer was **{trivia_q["c"]}**')
+        state['finished'] = True
+        await channel.send(f'⏰ Time\'s up! The answer was **{trivia_q["c"]}**')
 
 @bot.command()
 async def rps(ctx, choice: str):
@@ -586,40 +761,55 @@ async def rps(ctx, choice: str):
 
 @bot.command()
 async def gtn(ctx):
-    number = random.randint(1, 100)
-    attempts = 0
-    max_attempts = 7
+    state = {
+        'game': 'gtn',
+        'id': ctx.message.id,
+        'channel_id': ctx.channel.id,
+        'user_id': ctx.author.id,
+        'number': random.randint(1, 100),
+        'attempts': 0,
+        'max_attempts': 7
+    }
     
     embed = discord.Embed(
         title="🎯 Guess the Number!",
-        description=f"I'm thinking of a number between 1 and 100.\nYou have {max_attempts} attempts to guess it!",
+        description=f"I'm thinking of a number between 1 and 100.\nYou have {state['max_attempts']} attempts to guess it!",
         color=discord.Color.gold()
     )
     
     await ctx.send(embed=embed)
+    await run_game(ctx.channel, state)
+
+async def play_gtn(channel, state):
+    number = state['number']
+    max_attempts = state['max_attempts']
     
     def check(m):
-        return m.author == ctx.author and m.channel == ctx.channel and m.content.isdigit()
+        return m.author.id == state['user_id'] and m.channel.id == state['channel_id'] and m.content.isdigit()
     
-    while attempts < max_attempts:
+    while state['attempts'] < max_attempts:
         try:
             msg = await bot.wait_for('message', timeout=30.0, check=check)
             guess = int(msg.content)
-            attempts += 1
+            state['attempts'] += 1
+            attempts = state['attempts']
             
             if guess == number:
-                await ctx.send(f'🎉 Congratulations! You guessed it in {attempts} attempts!')
+                state['finished'] = True
+                await channel.send(f'🎉 Congratulations! You guessed it in {attempts} attempts!')
                 return
             elif guess < number:
-                await ctx.send(f'📈 Higher! ({max_attempts - attempts} attempts left)')
+                await channel.send(f'📈 Higher! ({max_attempts - attempts} attempts left)')
             else:
-                await ctx.send(f'📉 Lower! ({max_attempts - attempts} attempts left)')
+                await channel.send(f'📉 Lower! ({max_attempts - attempts} attempts left)')
                 
         except asyncio.TimeoutError:
-            await ctx.send(f'⏰ Time\'s up! The number was **{number}**')
+            state['finished'] = True
+            await channel.send(f'⏰ Time\'s up! The number was **{number}**')
             return
     
-    await ctx.send(f'❌ Game over! The number was **{number}**')
+    state['finished'] = True
+    await channel.send(f'❌ Game over! The number was **{number}**')
 
 # ============ WELCOME SYSTEM ============
 
@@ -674,4 +864,30 @@ async def testwelcome(ctx):
         await ctx.send('❌ Welcome channel not found!')
 
 # Run the bot
-bot.run(TOKEN)
+async def main():
+    discord.utils.setup_logging()
+    restore_state()
+
+    # Save state on Ctrl+C / SIGTERM (e.g. during deploys) instead of dropping it
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, request_shutdown)
+        except NotImplementedError:
+            pass  # Not supported on Windows
+
+    try:
+        async with bot:
+            await bot.start(TOKEN)
+    finally:
+        # Ctrl+C on Windows or a failed login never reaches shutdown()
+        if not state_saved:
+            scanner.close()
+            try:
+                elapsed = save_state()
+                print(f'💾 Saved state to {SNAPSHOT_PATH} in {elapsed * 1000:.1f}ms')
+            except Exception as e:
+                print(f'❌ Could not save state to {SNAPSHOT_PATH}: {e}')
+
+if __name__ == '__main__':
+    asyncio.run(main())
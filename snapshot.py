@@ -0,0 +1,34 @@
+import gc
+import os
+import pickle
+from contextlib import contextmanager
+
+# Binary state snapshots: the state dict pickled with protocol 5.
+
+
+@contextmanager
+def gc_paused():
+    # Millions of small dicts trigger repeated full collections while
+    # (un)pickling; none of them can be garbage yet
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def save(path, state):
+    # Write to a temp file and rename so a crash never leaves a half snapshot
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f, gc_paused():
+        pickle.dump(state, f, protocol=5)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load(path):
+    with open(path, 'rb') as f, gc_paused():
+        return pickle.load(f)